@@ -1,26 +1,29 @@
 import argparse
+import json
 import os
 import sys
-import tempfile
-from datetime import datetime, timedelta
+from datetime import datetime
 from functools import partial
+from math import ceil
 from random import choice
+from typing import Optional
 
-import qtawesome
-import yaml
-from PyQt5.QtCore import QTimer, QTime, Qt, QDir, QUrl
+from PyQt5.QtCore import QTimer, Qt, QDir, QUrl, QElapsedTimer
 from PyQt5.QtGui import QIcon, QKeyEvent
-from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer
 from PyQt5.QtWidgets import QApplication, QWidget, QHBoxLayout, QPushButton, QSpinBox, QAction, QSizePolicy, \
     QMessageBox, QMenuBar, QStackedLayout, QSlider, QWidgetAction
 from PyQt5.QtWidgets import QVBoxLayout, QLabel
-from plyer import notification
 
 from florodoro.version import __version__
 from florodoro.history import History
+from florodoro.notifications import NotificationThread
 from florodoro.plants import GreenTree, DoubleGreenTree, OrangeTree, CircularFlower
+from florodoro.utilities import load_yaml, get_icon
 from florodoro.widgets import Canvas, Statistics, SpacedQWidget
 
+# names of the (non-plant) settings that are loaded/saved when the app opens/closes
+CONFIGURATION_NAMES = ("study-time", "break-time", "cycles", "sound", "sound-volume", "pop-ups", "overstudy")
+
 
 class Florodoro(QWidget):
 
@@ -56,6 +59,9 @@ class Florodoro(QWidget):
 
         self.DEBUG = arguments.debug
 
+        # how many times faster the time passes in debug mode
+        self.DEBUG_SPEEDUP = 1800
+
         os.chdir(os.path.dirname(os.path.realpath(__file__)))
 
         self.MIN_WIDTH = 600
@@ -66,8 +72,8 @@ class Florodoro(QWidget):
 
         self.ROOT_FOLDER = os.path.expanduser("~/.florodoro/")
 
-        self.HISTORY_FILE_PATH = self.ROOT_FOLDER + "history" + ("" if not self.DEBUG else "-debug") + ".yaml"
-        self.CONFIGURATION_FILE_PATH = self.ROOT_FOLDER + "config" + ("" if not self.DEBUG else "-debug") + ".yaml"
+        self.HISTORY_FILE_PATH = self.ROOT_FOLDER + "history" + ("" if not self.DEBUG else "-debug") + ".jsonl"
+        self.CONFIGURATION_FILE_PATH = self.ROOT_FOLDER + "config" + ("" if not self.DEBUG else "-debug") + ".json"
 
         self.history = History(self.HISTORY_FILE_PATH)
 
@@ -80,11 +86,11 @@ class Florodoro(QWidget):
 
         self.APP_NAME = "Florodoro"
 
-        self.STUDY_ICON = qtawesome.icon('fa5s.book', color=self.TEXT_COLOR)
-        self.BREAK_ICON = qtawesome.icon('fa5s.coffee', color=self.BREAK_COLOR)
-        self.CONTINUE_ICON = qtawesome.icon('fa5s.play', color=self.TEXT_COLOR)
-        self.PAUSE_ICON = qtawesome.icon('fa5s.pause', color=self.TEXT_COLOR)
-        self.RESET_ICON = qtawesome.icon('fa5s.undo', color=self.TEXT_COLOR)
+        self.STUDY_ICON = get_icon('fa5s.book', self.TEXT_COLOR.name())
+        self.BREAK_ICON = get_icon('fa5s.coffee', self.BREAK_COLOR)
+        self.CONTINUE_ICON = get_icon('fa5s.play', self.TEXT_COLOR.name())
+        self.PAUSE_ICON = get_icon('fa5s.pause', self.TEXT_COLOR.name())
+        self.RESET_ICON = get_icon('fa5s.undo', self.TEXT_COLOR.name())
 
         self.PLANTS = [GreenTree, DoubleGreenTree, OrangeTree, CircularFlower]
         self.PLANT_NAMES = ["Spruce", "Double spruce", "Maple", "Flower"]
@@ -136,7 +142,7 @@ class Florodoro(QWidget):
             QAction(
                 "&Statistics",
                 self,
-                triggered=lambda: self.statistics.show() if self.statistics.isHidden() else self.statistics.hide()
+                triggered=self.toggle_statistics
             )
         )
 
@@ -157,26 +163,28 @@ class Florodoro(QWidget):
 
         self.plant_menu = self.options_menu.addMenu("&Plants")
 
-        self.overstudy_action = QAction("Overstudy", self, checkable=True)
+        # the plant icons are only loaded when the menu is first shown, since generating them takes a while
+        self.plant_icons_loaded = False
+        self.plant_menu.aboutToShow.connect(self.load_plant_icons)
+
+        self.overstudy_action = QAction("Overstudy", self, checkable=True, toggled=self.overstudy_toggled)
         self.options_menu.addAction(self.overstudy_action)
 
-        self.plant_images = []
-        self.plant_checkboxes = []
+        # the checkable actions for enabling/disabling each of the plants, by plant name
+        self.plant_actions = {}
 
         # dynamically create widgets for each plant
-        for plant, name in zip(self.PLANTS, self.PLANT_NAMES):
-            self.plant_images.append(tempfile.NamedTemporaryFile(suffix=".svg"))
-            tmp = plant()
-            tmp.set_age(float('inf'))
-            tmp.save(self.plant_images[-1].name, 200, 200)
+        for name in self.PLANT_NAMES:
+            action = QAction(self, text=name, checkable=True, checked=True)
 
-            setattr(self.__class__, name,
-                    QAction(self, icon=QIcon(self.plant_images[-1].name), text=name, checkable=True, checked=True))
+            self.plant_menu.addAction(action)
+            self.plant_actions[name] = action
 
-            action = getattr(self.__class__, name)
+            action.toggled.connect(self.update_enabled_plants)
 
-            self.plant_menu.addAction(action)
-            self.plant_checkboxes.append(action)
+        # the plants that can currently be grown (updated when a checkbox is toggled)
+        self.enabled_plants = ()
+        self.update_enabled_plants()
 
         # the current plant that we're growing
         # if set to none, no plant is growing
@@ -191,7 +199,8 @@ class Florodoro(QWidget):
 
         self.canvas = Canvas(self)
 
-        self.statistics = Statistics(self.history)
+        # created when first shown (it unpickles a plant and builds the whole widget, which slows down the start)
+        self.statistics: Optional[Statistics] = None
 
         font = self.font()
         font.setPointSize(100)
@@ -232,6 +241,10 @@ class Florodoro(QWidget):
         self.is_study_ongoing = False
         self.is_break_ongoing = False
 
+        # the (quantized) age of the plant when the canvas was last repainted
+        # the canvas is only repainted when this changes, since the plant looks the same otherwise
+        self.drawn_plant_age = None
+
         # whether we notified the user already during overstudy
         self.already_notified = False
 
@@ -262,10 +275,27 @@ class Florodoro(QWidget):
 
         self.setLayout(main_vertical_layout)
 
-        self.study_timer_frequency = 1 / 60 * 1000
-        self.study_timer = QTimer(self, interval=int(self.study_timer_frequency), timeout=self.decrease_remaining_time)
+        # the timer only updates the label and grows the plant, so a few times a second is plenty
+        self.study_timer_frequency = 1 / 4 * 1000
+        # a monotonic clock that the ending time of the study/break is measured with (in milliseconds)
+        self.clock = QElapsedTimer()
+        self.clock.start()
+
+        # pick the tick function once, so the normal one doesn't have to check for debug mode each time
+        tick = self.decrease_remaining_time if not self.DEBUG else self.decrease_remaining_time_debug
+        self.study_timer = QTimer(self, interval=int(self.study_timer_frequency), timeout=tick)
+
+        # fires when the study/break runs out, so the study timer doesn't have to check for it every tick
+        # (precise, since coarse timers this long are rounded to whole seconds and could end the session early)
+        self.session_timer = QTimer(self, singleShot=True, timerType=Qt.PreciseTimer, timeout=self.end_session)
 
-        self.player = QMediaPlayer(self)
+        # a player for each of the sounds in the sound directory, by name (without the extension)
+        # created when the first sound is played, since importing QtMultimedia slows down the startup
+        self.sound_players = None
+
+        self.notification_thread = NotificationThread(self.APP_NAME, os.path.abspath(self.IMAGE_FOLDER + "icon.svg"),
+                                                      self)
+        self.notification_thread.start()
 
         self.setWindowIcon(QIcon(self.IMAGE_FOLDER + "icon.svg"))
         self.setWindowTitle(self.APP_NAME)
@@ -273,21 +303,32 @@ class Florodoro(QWidget):
         # set initial UI state
         self.reset()
 
-        # a list of name, getter and setter things to load/save when the app opens/closes
+        # getters and setters of things to load/save when the app opens/closes (see CONFIGURATION_NAMES)
         # also dynamically get settings for selecting/unselecting plants
-        self.CONFIGURATION_ATTRIBUTES = [("study-time", self.study_time_spinbox.value,
-                                          self.study_time_spinbox.setValue),
-                                         ("break-time", self.break_time_spinbox.value,
-                                          self.break_time_spinbox.setValue),
-                                         ("cycles", self.cycles_spinbox.value, self.cycles_spinbox.setValue),
-                                         ("sound", self.sound_action.isChecked, self.sound_action.setChecked),
-                                         ("sound-volume", self.volume_slider.value, self.volume_slider.setValue),
-                                         ("pop-ups", self.popup_action.isChecked, self.popup_action.setChecked),
-                                         ("overstudy", self.overstudy_action.isChecked,
-                                          self.overstudy_action.setChecked)] + \
-                                        [(name.lower(), getattr(self.__class__, name).isChecked,
-                                          getattr(self.__class__, name).setChecked) for _, name in
-                                         zip(self.PLANTS, self.PLANT_NAMES)]
+        self.configuration_getters = dict(zip(CONFIGURATION_NAMES, (
+            self.study_time_spinbox.value,
+            self.break_time_spinbox.value,
+            self.cycles_spinbox.value,
+            self.sound_action.isChecked,
+            self.volume_slider.value,
+            self.popup_action.isChecked,
+            self.overstudy_action.isChecked,
+        )))
+
+        self.configuration_setters = dict(zip(CONFIGURATION_NAMES, (
+            self.study_time_spinbox.setValue,
+            self.break_time_spinbox.setValue,
+            self.cycles_spinbox.setValue,
+            self.sound_action.setChecked,
+            self.volume_slider.setValue,
+            self.popup_action.setChecked,
+            self.overstudy_action.setChecked,
+        )))
+
+        for name, action in self.plant_actions.items():
+            self.configuration_getters[name.lower()] = action.isChecked
+            self.configuration_setters[name.lower()] = action.setChecked
+
         # load the default preset
         self.load_preset(*self.presets[self.DEFAULT_PRESET])
 
@@ -295,44 +336,76 @@ class Florodoro(QWidget):
         self.show()
 
     def load_settings(self):
-        """Loads the settings file (if it exists)."""
+        """Loads the settings file (if it exists). If it doesn't, the old (YAML) settings file is loaded instead."""
+        yaml_path = os.path.splitext(self.CONFIGURATION_FILE_PATH)[0] + ".yaml"
+
         if os.path.exists(self.CONFIGURATION_FILE_PATH):
-            with open(self.CONFIGURATION_FILE_PATH) as file:
-                configuration = yaml.load(file, Loader=yaml.FullLoader)
+            with open(self.CONFIGURATION_FILE_PATH) as f:
+                configuration = json.load(f)
+        elif os.path.exists(yaml_path):
+            configuration = load_yaml(yaml_path)
+        else:
+            return
 
-                # don't crash if config is broken
-                if not isinstance(configuration, dict):
-                    return
+        # don't crash if config is broken
+        if not isinstance(configuration, dict):
+            return
 
-                for key in configuration:
-                    for name, _, setter in self.CONFIGURATION_ATTRIBUTES:
-                        if key == name:
-                            setter(configuration[key])
+        for key, value in configuration.items():
+            setter = self.configuration_setters.get(key)
+
+            if setter is not None:
+                setter(value)
 
     def save_settings(self):
         """Saves the settings file (if it exists)."""
         if not os.path.exists(self.ROOT_FOLDER):
             os.mkdir(self.ROOT_FOLDER)
 
-        with open(self.CONFIGURATION_FILE_PATH, 'w') as file:
-            configuration = {}
-
-            for name, getter, _ in self.CONFIGURATION_ATTRIBUTES:
-                configuration[name] = getter()
+        configuration = {name: getter() for name, getter in self.configuration_getters.items()}
 
-            file.write(yaml.dump(configuration))
+        with open(self.CONFIGURATION_FILE_PATH, "w") as f:
+            json.dump(configuration, f, indent=2)
 
     def closeEvent(self, event):
         """Called when the app is being closed. Overridden to also save Florodoro settings."""
         self.save_settings()
+        self.notification_thread.stop()
         super().closeEvent(event)
 
+    def toggle_statistics(self):
+        """Show the statistics if they're hidden, hide them otherwise."""
+        if self.statistics is None:
+            self.statistics = Statistics(self.history)
+
+        if self.statistics.isHidden():
+            self.statistics.show()
+        else:
+            self.statistics.hide()
+
     def load_preset(self, study_value: int, break_value: int, cycles: int):
         """Load a pomodoro preset."""
         self.study_time_spinbox.setValue(study_value)
         self.break_time_spinbox.setValue(break_value)
         self.cycles_spinbox.setValue(cycles)
 
+    def load_plant_icons(self):
+        """Set the icons of the plant actions (if they weren't set already)."""
+        if self.plant_icons_loaded:
+            return
+
+        for plant, action in zip(self.PLANTS, self.plant_actions.values()):
+            tmp = plant()
+            tmp.set_age(float('inf'))
+            action.setIcon(QIcon(tmp.render(200, 200)))
+
+        self.plant_icons_loaded = True
+
+    def update_enabled_plants(self):
+        """Update the tuple of plants that can be grown, depending on which plant checkboxes are checked."""
+        self.enabled_plants = tuple(plant for plant, action in zip(self.PLANTS, self.plant_actions.values())
+                                    if action.isChecked())
+
     def infinite_cycles(self) -> bool:
         """Return True if we're doing an infinite number of cycles."""
         return self.cycles_spinbox.value() == 0
@@ -379,14 +452,14 @@ class Florodoro(QWidget):
         # the total time to study for (spinboxes are minutes)
         # since it's rounded down and it looks better to start at the exact time, 0.99 is added
         self.total_time = (self.study_time_spinbox if not do_break else self.break_time_spinbox).value() * 60 + 0.99
-        self.ending_time = datetime.now() + timedelta(minutes=self.total_time / 60)
+        self.ending_time = self.clock.elapsed() + int(self.total_time * 1000)
 
         # don't start showing canvas and growing the plant when we're not studying
         if not do_break:
-            possible_plants = [plant for i, plant in enumerate(self.PLANTS) if self.plant_checkboxes[i].isChecked()]
+            self.drawn_plant_age = None
 
-            if len(possible_plants) != 0:
-                self.plant = choice(possible_plants)()
+            if len(self.enabled_plants) != 0:
+                self.plant = choice(self.enabled_plants)()
                 self.canvas.set_drawable(self.plant)
                 self.plant.set_age(0)
             else:
@@ -394,6 +467,7 @@ class Florodoro(QWidget):
 
         self.study_timer.stop()  # it could be running - we could be currently in a break
         self.study_timer.start()
+        self.session_timer.start(int(self.total_time * 1000))
 
         # so it's displayed immediately
         self.update_time_label(self.total_time)
@@ -407,13 +481,15 @@ class Florodoro(QWidget):
         # stop the timer, if it's running
         if self.study_timer.isActive():
             self.study_timer.stop()
+            self.session_timer.stop()
             self.pause_button.setIcon(self.CONTINUE_ICON)
-            self.pause_time = datetime.now()
+            self.pause_time = self.clock.elapsed()
 
         # if not, resume
         else:
-            self.ending_time += datetime.now() - self.pause_time
+            self.ending_time += self.clock.elapsed() - self.pause_time
             self.study_timer.start()
+            self.schedule_session_end()
             self.pause_button.setIcon(self.PAUSE_ICON)
 
         self.update_status_label()
@@ -429,6 +505,7 @@ class Florodoro(QWidget):
     def reset(self):
         """Reset the UI."""
         self.study_timer.stop()
+        self.session_timer.stop()
         self.pause_button.setIcon(self.PAUSE_ICON)
 
         self.main_label.setStyleSheet('')
@@ -463,27 +540,45 @@ class Florodoro(QWidget):
             if minutes == 0:
                 result += str(seconds)
             else:
-                result += str(minutes) + QTime(0, 0, seconds).toString(":ss")
+                result += f"{minutes}:{seconds:02d}"
         else:
-            result += str(hours) + QTime(0, minutes, seconds).toString(":mm:ss")
+            result += f"{hours}:{minutes:02d}:{seconds:02d}"
 
-        self.main_label.setText(result)
+        # only set the text when it changes, since it causes the label to be repainted
+        main_label = self.main_label
+        if result != main_label.text():
+            main_label.setText(result)
+
+    def create_sound_players(self):
+        """Create a player for each of the sounds in the sound directory. Each one has its media already set, so
+        playing the sound doesn't need to load it again."""
+        from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer
+
+        self.sound_players = {}
+        for file in os.listdir(self.SOUNDS_FOLDER):
+            name, _ = os.path.splitext(file)
+            path = QDir.current().absoluteFilePath(self.SOUNDS_FOLDER + file)
+
+            player = QMediaPlayer(self)
+            player.setMedia(QMediaContent(QUrl.fromLocalFile(path)))
+
+            self.sound_players[name] = player
 
     def play_sound(self, name: str):
         """Play a file from the sound directory. Extension is not included, will be added automatically."""
-        for file in os.listdir(self.SOUNDS_FOLDER):
-            # if the file starts with the provided name and only contains an extension after, try to play it
-            if file.startswith(name) and file[len(name):][0] == ".":
-                path = QDir.current().absoluteFilePath(self.SOUNDS_FOLDER + file)
-                url = QUrl.fromLocalFile(path)
-                content = QMediaContent(url)
-                self.player.setMedia(content)
-                self.player.setVolume(self.volume_slider.value())
-                self.player.play()
+        if self.sound_players is None:
+            self.create_sound_players()
+
+        player = self.sound_players.get(name)
+
+        # don't crash if there is no such sound
+        if player is not None:
+            player.setVolume(self.volume_slider.value())
+            player.play()
 
     def show_notification(self, message: str):
-        """Show the specified notification using plyer."""
-        notification.notify(self.APP_NAME, message, self.APP_NAME, os.path.abspath(self.IMAGE_FOLDER + "icon.svg"))
+        """Show the specified notification using plyer (in a separate thread, so this doesn't block)."""
+        self.notification_thread.notify(message)
 
     def update_cycles_label(self):
         """Update the cycles label, if we're currently studying and it wouldn't be 1/1.
@@ -510,53 +605,87 @@ class Florodoro(QWidget):
 
     def get_leftover_time(self):
         """Return time until the timer runs out (in seconds). Can be negative!"""
-        return (self.ending_time - datetime.now()).total_seconds()
+        return (self.ending_time - self.clock.elapsed()) / 1000
 
-    def decrease_remaining_time(self):
-        """Decrease the remaining time by the timer frequency. Updates clock/plant growth."""
-        if self.DEBUG:
-            self.ending_time -= timedelta(seconds=30)
+    def schedule_session_end(self):
+        """(Re)schedule the end of the current study/break, according to the leftover time."""
+        self.session_timer.start(max(0, ceil(self.get_leftover_time() * 1000)))
 
-        self.update_time_label(self.get_leftover_time())
+    def overstudy_toggled(self, checked: bool):
+        """Called when overstudy is toggled. When turned off while overstudying, end the study/break right away."""
+        if not checked and self.study_timer.isActive() and self.get_leftover_time() <= 0:
+            self.end_session()
+
+    def end_session(self):
+        """Called when the current study/break runs out. Notifies the user and, unless overstudying, moves on to the
+        next break/study."""
+        # if the timer fired early, wait for the rest of the session
+        if self.get_leftover_time() > 0:
+            self.schedule_session_end()
+            return
+
+        overstudy = self.overstudy_action.isChecked()
 
-        if self.get_leftover_time() <= 0:
-            if self.is_study_ongoing:
-                if not self.already_notified:
-                    if self.sound_action.isChecked():
-                        self.play_sound("study_done")
+        if self.is_study_ongoing:
+            if not self.already_notified:
+                if self.sound_action.isChecked():
+                    self.play_sound("study_done")
 
-                    if self.popup_action.isChecked():
-                        self.show_notification("Studying finished, take a break!")
+                if self.popup_action.isChecked():
+                    self.show_notification("Studying finished, take a break!")
 
-                    self.already_notified = True
+                self.already_notified = True
 
-                if not self.overstudy_action.isChecked():
-                    self.start(do_break=True)
+            if not overstudy:
+                self.start(do_break=True)
 
-            elif self.is_break_ongoing:
-                if not self.already_notified:
-                    if self.sound_action.isChecked():
-                        self.play_sound("break_done")
+        elif self.is_break_ongoing:
+            if not self.already_notified:
+                if self.sound_action.isChecked():
+                    self.play_sound("break_done")
 
-                    if self.popup_action.isChecked():
-                        self.show_notification("Break is over!")
+                if self.popup_action.isChecked():
+                    self.show_notification("Break is over!")
 
-                    self.already_notified = True
+                self.already_notified = True
 
-                if not self.overstudy_action.isChecked():
-                    if self.remaining_cycles == 0:
-                        self.save_break()
-                        self.reset()
-                    else:
-                        self.start()
-                        self.update_cycles_label()
+            if not overstudy:
+                if self.remaining_cycles == 0:
+                    self.save_break()
+                    self.reset()
+                else:
+                    self.start()
+                    self.update_cycles_label()
+
+    def decrease_remaining_time(self):
+        """Decrease the remaining time by the timer frequency. Updates clock/plant growth."""
+        self.update_time_label(self.get_leftover_time())
 
         # if we haven't finished studying, grow the plant
         if self.is_study_ongoing:
-            if self.plant is not None:
-                self.plant.set_age(self.duration())
+            duration = self.duration()
+            plant = self.plant
+            canvas = self.canvas
+
+            if plant is not None:
+                plant.set_age(duration)
+
+                # the size of the plant is proportional to its age coefficient (0 to 1), so quantizing it by the size
+                # of the plant's drawing area makes it only repaint when it grew by about a pixel
+                drawn_plant_age = int(plant.get_age_coefficient() * min(canvas.width(), canvas.height()))
+
+                if drawn_plant_age != self.drawn_plant_age:
+                    self.drawn_plant_age = drawn_plant_age
+                    canvas.update_drawable()
+
+    def decrease_remaining_time_debug(self):
+        """The debug mode version of decrease_remaining_time, in which the time passes a lot faster."""
+        self.ending_time -= int(self.study_timer_frequency * (self.DEBUG_SPEEDUP - 1))
+
+        if self.session_timer.isActive():
+            self.schedule_session_end()
 
-            self.canvas.update()
+        self.decrease_remaining_time()
 
     def duration(self):
         """Get the current duration of whatever is currently going on (in minutes)."""
@@ -565,14 +694,16 @@ class Florodoro(QWidget):
     def save_break(self):
         self.history.add_break(datetime.now(), self.duration())
 
-        self.statistics.refresh()
+        if self.statistics is not None:
+            self.statistics.refresh()
 
     def save_study(self):
         """Save the record of the current study to the history file."""
         self.history.add_study(datetime.now(), self.duration(), self.plant)
 
-        self.statistics.move()
-        self.statistics.refresh()
+        if self.statistics is not None:
+            self.statistics.move()
+            self.statistics.refresh()
 
 
 def run():
@@ -1,10 +1,12 @@
+import json
 import os
 import pickle
+from base64 import b64encode, b64decode
+from datetime import datetime
 from typing import List
 
-import yaml
-
 from florodoro.plants import Plant
+from florodoro.utilities import load_yaml
 
 
 class History:
@@ -14,41 +16,139 @@ class History:
         self.path = path
 
         self.history = {}
+
+        # running totals (updated when adding), so they don't have to be recalculated from the entire history
+        self.total_time = {}
+        self.plants_grown = 0
+        self.weekday_study_time = [0] * 7
+
+        # the studies sorted on date, together with the version of the studies they were sorted for
+        self.studies_version = 0
+        self.sorted_studies = (-1, [])
+
         self.load()
 
+    @staticmethod
+    def _encode_record(record: dict) -> dict:
+        """Convert a break/study record to one that can be saved as JSON (dates as ISO strings, plants in base64)."""
+        record = dict(record)
+        record["date"] = record["date"].isoformat()
+
+        if record.get("plant") is not None:
+            record["plant"] = b64encode(record["plant"]).decode("ascii")
+
+        return record
+
+    @staticmethod
+    def _decode_record(record: dict) -> dict:
+        """The inverse of _encode_record."""
+        record["date"] = datetime.fromisoformat(record["date"])
+
+        if record.get("plant") is not None:
+            record["plant"] = b64decode(record["plant"])
+
+        return record
+
     def save(self):
-        """Save the current history to the history file."""
-        with open(self.path, "w") as f:
-            f.write(yaml.dump(self.history))
+        """Save the entire history to the history file (one JSON record per line)."""
+        # a large buffer, so the whole history is written in a few (instead of many small) writes
+        with open(self.path, "w", buffering=1 << 20) as f:
+            f.writelines(self._format_record(activity, record)
+                         for activity, records in self.history.items() for record in records)
+
+    def _format_record(self, activity: str, record: dict) -> str:
+        """Return a record of the given activity as one line of the history file."""
+        return json.dumps({"activity": activity, **self._encode_record(record)}) + "\n"
+
+    def _append(self, activity: str, record: dict):
+        """Add the record to the history and append it to the history file (without rewriting the rest of it)."""
+        self.history[activity].append(record)
+        self._count_record(activity, record)
+
+        line = self._format_record(activity, record)
+
+        # if the last line wasn't finished (e.g. the app was killed while writing it), start a new one, so the record
+        # isn't merged with it (and skipped when loading)
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+
+                if f.read(1) != b"\n":
+                    line = "\n" + line
+
+        with open(self.path, "a") as f:
+            f.write(line)
 
     def load(self):
-        """Load the history from the history file."""
+        """Load the history from the history file. If it doesn't exist, the old YAML history file (same name, .yaml
+        extension) is loaded and saved in the new format instead."""
+        yaml_path = os.path.splitext(self.path)[0] + ".yaml"
+
         if os.path.exists(self.path):
-            with open(self.path) as file:
-                self.history = yaml.load(file, Loader=yaml.FullLoader)
+            self.history = {}
+
+            with open(self.path) as f:
+                for line in f:
+                    # skip empty lines (and a possibly unfinished last one)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    if not isinstance(record, dict) or "activity" not in record:
+                        continue
+
+                    activity = record.pop("activity")
+                    self.history.setdefault(activity, []).append(self._decode_record(record))
 
-                # ignore the result if isn't a dictionary
-                if not isinstance(self.history, dict):
-                    self.history = {}
+        elif os.path.exists(yaml_path):
+            # the old history only contains timestamps and (pickled) binary data, so the safe loader is enough
+            self.history = load_yaml(yaml_path)
+
+            # ignore the result if isn't a dictionary
+            if not isinstance(self.history, dict):
+                self.history = {}
 
         # create the activities that we save
         for activity in ("breaks", "studies"):
             if activity not in self.history:
                 self.history[activity] = []
 
+        self.total_time = {}
+        self.plants_grown = 0
+        self.weekday_study_time = [0] * 7
+
+        for activity, records in self.history.items():
+            for record in records:
+                self._count_record(activity, record)
+
+        # convert the old history file, so it doesn't have to be parsed again
+        if not os.path.exists(self.path) and os.path.exists(yaml_path):
+            self.save()
+
+    def _count_record(self, activity: str, record: dict):
+        """Add the record to the running totals."""
+        # TODO: check for correct formatting, don't just crash if it's wrong
+        self.total_time[activity] = self.total_time.get(activity, 0) + record["duration"]
+
+        if activity == "studies":
+            self.studies_version += 1
+            self.weekday_study_time[record["date"].weekday()] += record["duration"]
+
+            if record["plant"] is not None:
+                self.plants_grown += 1
+
     def add_break(self, date, duration: float):
         """Add a break to the history. The date is the ENDING time."""
-        self.history["breaks"].append({"date": date, "duration": duration})
-        self.save()
+        self._append("breaks", {"date": date, "duration": duration})
 
     def add_study(self, date, duration: float, plant: Plant):
         """Add a break to the history. The date is the ENDING time."""
-        self.history["studies"].append({
+        self._append("studies", {
             "date": date,
             "duration": duration,
-            "plant": pickle.dumps(plant)
+            "plant": pickle.dumps(plant, protocol=pickle.HIGHEST_PROTOCOL)
         })
-        self.save()
 
     def total_studied_time(self) -> float:
         """Return the total minutes of studied time."""
@@ -59,31 +159,27 @@ class History:
         return self._total_activity_time("breaks")
 
     def _total_activity_time(self, activity_type: str):
-        """Calculate the total time of something."""
-        # TODO: check for correct formatting, don't just crash if it's wrong
-        total = 0
-        for study in self.history[activity_type]:
-            total += study["duration"]
-
-        return total
+        """Return the total time of something."""
+        return self.total_time.get(activity_type, 0)
 
     def total_plants_grown(self) -> int:
         """Return the total number of plants grown."""
-        count = 0
-        for study in self.get_studies():
-            # TODO: check for correct formatting, don't just crash if it's wrong
+        return self.plants_grown
 
-            if study["plant"] is not None:
-                count += 1
-
-        return count
+    def study_time_by_weekday(self) -> List[float]:
+        """Return the total minutes of studied time for each day of the week (starting with Monday)."""
+        return self.weekday_study_time
 
     def get_studies(self, sort=True) -> List:
-        """Return all of the studies. Possibly sort on date."""
+        """Return all of the studies. Possibly sort on date.
+        The sorted studies are only re-sorted when a study was added since the last call, so don't modify them."""
         studies = self.history["studies"]
 
         # TODO: check for correct formatting, don't just crash if it's wrong
         if sort:
-            studies = sorted(studies, key=lambda x: x["date"])
+            if self.sorted_studies[0] != self.studies_version:
+                self.sorted_studies = (self.studies_version, sorted(studies, key=lambda x: x["date"]))
+
+            studies = self.sorted_studies[1]
 
         return studies
@@ -0,0 +1,51 @@
+import queue
+from time import monotonic
+
+from PyQt5.QtCore import QThread
+
+
+class NotificationThread(QThread):
+    """A thread for showing desktop notifications, so the (possibly slow) plyer calls don't block the UI.
+    If the same notification is requested multiple times in quick succession, it is only shown once."""
+
+    def __init__(self, app_name: str, icon_path: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.app_name = app_name
+        self.icon_path = icon_path
+
+        # how long (in seconds) to ignore the same notification for, after it has been shown
+        self.DUPLICATE_TIMEOUT = 5
+
+        # messages of notifications to show; None stops the thread
+        self.messages = queue.Queue()
+
+    def notify(self, message: str):
+        """Queue a notification with the specified message to be shown."""
+        self.messages.put(message)
+
+    def stop(self):
+        """Stop the thread after the queued notifications are shown, waiting for it to finish."""
+        self.messages.put(None)
+        self.wait()
+
+    def run(self):
+        # imported here, so the (slow) import happens in this thread and doesn't block the startup
+        from plyer import notification
+
+        last_message = None
+        last_time = 0
+
+        while True:
+            message = self.messages.get()
+
+            if message is None:
+                return
+
+            if message == last_message and monotonic() - last_time < self.DUPLICATE_TIMEOUT:
+                continue
+
+            notification.notify(self.app_name, message, self.app_name, self.icon_path)
+
+            last_message = message
+            last_time = monotonic()
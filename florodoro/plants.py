@@ -1,10 +1,10 @@
 from abc import abstractmethod, ABC
 from math import degrees, sin, acos, sqrt
 from random import uniform, random, randint, choice
-from typing import Callable
+from typing import Callable, Optional
 
-from PyQt5.QtCore import QSize, QRect, QPointF, QRectF, Qt
-from PyQt5.QtGui import QPainter, QColor, QPainterPath, QPen, QBrush
+from PyQt5.QtCore import QSize, QRect, QPointF, QRectF, Qt, QBuffer, QByteArray
+from PyQt5.QtGui import QPainter, QColor, QPainterPath, QPen, QBrush, QTransform, QPixmap
 from PyQt5.QtSvg import QSvgGenerator
 
 from florodoro.utilities import smoothen_curve
@@ -19,10 +19,29 @@ class Drawable(ABC):
         """Draw the drawable onto a painter, given its size."""
         pass
 
-    def save(self, path: str, width: int, height: int):
-        """Save the drawable to the specified file, given its size."""
+    def bounding_rect(self, width: int, height: int) -> QRect:
+        """Return the rectangle that the drawable is drawn in, given its size."""
+        return QRect(0, 0, width, height)
+
+    def render(self, width: int, height: int) -> QPixmap:
+        """Render the drawable to a (transparent) pixmap, given its size."""
+        pixmap = QPixmap(width, height)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        self.draw(painter, width, height)
+        painter.end()
+
+        return pixmap
+
+    def render_svg(self, width: int, height: int) -> QByteArray:
+        """Render the drawable to an SVG (in memory), given its size."""
+        buffer = QBuffer()
+        buffer.open(QBuffer.ReadWrite)
+
         generator = QSvgGenerator()
-        generator.setFileName(path)
+        generator.setOutputDevice(buffer)
         generator.setSize(QSize(width, height))
         generator.setViewBox(QRect(0, 0, width, height))
 
@@ -30,6 +49,13 @@ class Drawable(ABC):
         self.draw(painter, width, height)
         painter.end()
 
+        return buffer.data()
+
+    def save(self, path: str, width: int, height: int):
+        """Save the drawable to the specified file, given its size."""
+        with open(path, "wb") as f:
+            f.write(bytes(self.render_svg(width, height)))
+
 
 class Color:
     green = QColor(0, 119, 0)
@@ -46,20 +72,76 @@ class Color:
     ]
 
 
+class Brush:
+    """Brushes of the colors, so they aren't created again on every draw."""
+    green = QBrush(Color.green)
+    white = QBrush(Color.white)
+    brown = QBrush(Color.brown)
+    orange = QBrush(Color.orange)
+
+    # brushes of other colors, by their RGBA value (created when first needed)
+    of_colors = {}
+
+    @staticmethod
+    def of(color: QColor) -> QBrush:
+        """Return the brush of the given color."""
+        rgba = color.rgba()
+
+        if rgba not in Brush.of_colors:
+            Brush.of_colors[rgba] = QBrush(color)
+
+        return Brush.of_colors[rgba]
+
+
+class Pen:
+    """Pens that don't change, so they aren't created again on every draw."""
+    none = QPen(Qt.NoPen)
+
+
 class Plant(Drawable):
     age: float = 0
 
+    # the age adjusted from 0 to 1 (see get_age_coefficient), calculated only when the age changes
+    adjusted_age: float = 0
+
+    # the smoothened (slower) age coefficients, calculated once per draw (the values for age 0 until the first one)
+    smooth_age_coefficient: float = 0
+    smooth_slower_age_coefficient: float = 0
+
     # coefficient that change how quickly the plant grows
     age_coefficient = 15
     age_exponent = 2
 
+    # the age coefficient under which the plant is not drawn at all
+    INVISIBLE_AGE_COEFFICIENT = 1e-3
+
+    # attributes that are calculated from the others (see set_age, draw and precompute), so they aren't pickled
+    DERIVED_ATTRIBUTES = ("adjusted_age", "smooth_age_coefficient", "smooth_slower_age_coefficient")
+
     def __init__(self):
         # make the sizes somewhat random
         self.deficit_coefficient = uniform(0.9, 1)
 
+    def __getstate__(self):
+        """Called when the plant is pickled. Leaves out the derived attributes, which __setstate__ calculates again."""
+        return {name: value for name, value in self.__dict__.items() if name not in self.DERIVED_ATTRIBUTES}
+
+    def __setstate__(self, state):
+        """Called when the plant is unpickled. The precomputed values are calculated again, since plants pickled by
+        older versions don't have them."""
+        self.__dict__.update(state)
+        self.set_age(self.age)
+        self.precompute()
+
+    def precompute(self):
+        """Calculate values that only depend on the (random) parameters of the plant, so they aren't calculated again
+        on every draw. Called whenever the parameters are generated."""
+        pass
+
     def set_age(self, age: float):
         """Set the current age of the plant (in minutes)."""
         self.age = age
+        self.adjusted_age = self.age_coefficient_function(age)
 
     def age_coefficient_function(self, x) -> float:
         """The function that calculates the normalized age [0, 1] from actual age (in minutes)."""
@@ -67,12 +149,11 @@ class Plant(Drawable):
 
     def inverse_age_coefficient_function(self, x) -> float:
         """The inverse to the age function."""
-        return float('inf') if x == 1 else (self.age_coefficient * x ** (1 / self.age_exponent)) / (1 - x) ** (
-                1 / self.age_exponent)
+        return float('inf') if x == 1 else self.age_coefficient * (x / (1 - x)) ** (1 / self.age_exponent)
 
     def get_age_coefficient(self) -> float:
         """Return the age, adjusted from 0 to 1."""
-        return self.age_coefficient_function(self.age)
+        return self.adjusted_age
 
     def get_slower_age_coefficient(self) -> float:
         """Return the age, adjusted from 0 to 1, but increasing slower."""
@@ -83,19 +164,36 @@ class Plant(Drawable):
         """The actual implementation of the plant drawn."""
         pass
 
+    def bounding_rect(self, width: int, height: int) -> QRect:
+        """Return the rectangle that the plant is drawn in (the bottom center square), given the width and height."""
+        size = min(width, height)
+        return QRect((width - size) // 2, height - size, size, size)
+
     def draw(self, painter: QPainter, width: int, height: int):
         """Draw the plant on the painter, given the width and height."""
-        w = min(width, height)
-        h = min(width, height)
+        # the plant is too young to be visible, so there is nothing to draw
+        if self.get_age_coefficient() < self.INVISIBLE_AGE_COEFFICIENT:
+            return
+
+        w = h = min(width, height)
 
         # position to the bottom center of the canvas
         painter.translate(width / 2, height)
         painter.scale(1, -1)
 
+        # these are used a lot in _draw (of each of the classes in the hierarchy), so only calculate them once per draw
+        self.smooth_age_coefficient = smoothen_curve(self.get_age_coefficient())
+        self.smooth_slower_age_coefficient = smoothen_curve(self.get_slower_age_coefficient())
+
         self._draw(painter, w, h)
 
 
 class Flower(Plant):
+    DERIVED_ATTRIBUTES = Plant.DERIVED_ATTRIBUTES + ("leaf_positions", "leaf_coefficients", "leaf_rotations",
+                                                     "leaf_lean")
+
+    # the path of a leaf of size 1 (scaled when drawn), created when first needed
+    leaf_template: Optional[QPainterPath] = None
 
     def __init__(self):
         super().__init__()
@@ -114,6 +212,27 @@ class Flower(Plant):
                        (((i - 1 / 2) * 2) if count == 2 else (-1 if random() < 0.5 else 1))) for i in
                       range(count)]
 
+        self.precompute()
+
+    def precompute(self):
+        super().precompute()
+
+        # the positions, size coefficients and rotations of the leafs in degrees (which the painter uses)
+        self.leaf_positions = tuple(position for position, _, _ in self.leafs)
+        self.leaf_coefficients = tuple(coefficient for _, coefficient, _ in self.leafs)
+        self.leaf_rotations = tuple(degrees(rotation) for _, _, rotation in self.leafs)
+
+        # the rotation of the leafs according to where the flower is leaning towards (in degrees)
+        # the stem only gets larger as the flower grows (its shape stays the same), so it only depends on the ratio of
+        # the flower center's coordinates, which doesn't change
+        self.leaf_lean = -degrees(sin(self.flower_center_x(1) / self.flower_center_y(1)))
+
+    @staticmethod
+    def stem_point(t: float, x: float, y: float):
+        """Return the point at parameter t of the stem (a quadratic Bézier curve) ending at (x, y).
+        This is what pointAtPercent returns for the stem's path, since it maps its argument to t for curves."""
+        return t * t * x, 2 * (1 - t) * t * 0.6 * y + t * t * y
+
     def flower_center_x(self, width):
         """The x coordinate of the center of the flower."""
         return width / 9 * self.x_coefficient
@@ -126,43 +245,61 @@ class Flower(Plant):
         """The size of the leaf."""
         return width / 7 * self.deficit_coefficient
 
+    @staticmethod
+    def get_leaf_template() -> QPainterPath:
+        """Return the path of a leaf of size 1."""
+        if Flower.leaf_template is None:
+            leaf = QPainterPath()
+            leaf.setFillRule(Qt.WindingFill)
+            leaf.quadTo(0.4, 0.5, 0, 1)
+            leaf.cubicTo(0, 0.5, -0.4, 0.4, 0, 0)
+
+            Flower.leaf_template = leaf
+
+        return Flower.leaf_template
+
     def _draw(self, painter: QPainter, width: int, height: int):
-        self.x = self.flower_center_x(width) * smoothen_curve(self.get_age_coefficient())
-        self.y = self.flower_center_y(height) * smoothen_curve(self.get_age_coefficient())
+        smooth_age = self.smooth_age_coefficient
 
-        painter.setPen(QPen(Color.green, self.stem_width * smoothen_curve(self.get_age_coefficient())))
+        self.x = self.flower_center_x(width) * smooth_age
+        self.y = self.flower_center_y(height) * smooth_age
+
+        painter.setPen(QPen(Color.green, self.stem_width * smooth_age))
 
         # draw the stem
         path = QPainterPath()
         path.quadTo(0, self.y * 0.6, self.x, self.y)
         painter.drawPath(path)
 
+        leaf_size = self.leaf_size(width) * smooth_age ** 2
+        leaf_template = self.get_leaf_template()
+
+        painter.setBrush(Brush.green)
+        painter.setPen(Pen.none)
+
+        # bound to locals, since they're used for each of the leaves
+        x, y = self.x, self.y
+        stem_point = self.stem_point
+        leaf_lean = self.leaf_lean
+
         # draw the leaves
-        for position, coefficient, rotation in self.leafs:
+        for position, coefficient, leaf_rotation in zip(self.leaf_positions, self.leaf_coefficients,
+                                                        self.leaf_rotations):
             painter.save()
 
             # find the point on the stem and rotate the leaf accordingly
-            painter.translate(path.pointAtPercent(position))
-            painter.rotate(degrees(rotation))
-
-            # rotate according to where the flower is leaning towards
-            if self.y != 0:
-                painter.rotate(-degrees(sin(self.x / self.y)))
+            # (and according to where the flower is leaning towards)
+            painter.translate(*stem_point(position, x, y))
+            painter.rotate(leaf_rotation + leaf_lean)
 
             # make it so both leaves are facing the same direction
-            if rotation < 0:
+            if leaf_rotation < 0:
                 painter.scale(-1, 1)
 
-            painter.setBrush(QBrush(Color.green))
-            painter.setPen(QPen(0))
-
             # draw the leaf
-            leaf = QPainterPath()
-            leaf.setFillRule(Qt.WindingFill)
-            ls = self.leaf_size(width) * smoothen_curve(self.get_age_coefficient()) ** 2 * coefficient
-            leaf.quadTo(0.4 * ls, 0.5 * ls, 0, ls)
-            leaf.cubicTo(0, 0.5 * ls, -0.4 * ls, 0.4 * ls, 0, 0)
-            painter.drawPath(leaf)
+            ls = leaf_size * coefficient
+            painter.scale(ls, ls)
+            painter.drawPath(leaf_template)
 
             painter.restore()
 
@@ -170,6 +307,16 @@ class Flower(Plant):
 class CircularFlower(Flower):
     """A class for creating a flower."""
 
+    # paths of the pellets of size 1 (scaled when drawn), by the name of the pellet function
+    pellet_templates = {}
+
+    # all of the (rotated) pellets of size 1 as paths of at most MAX_PATH_ELEMENTS elements,
+    # by the name of the pellet function and the number of pellets
+    pellet_paths = {}
+
+    # the maximum number of elements of a path of pellets that is drawn at once
+    MAX_PATH_ELEMENTS = 100
+
     def __init__(self):
         super().__init__()
 
@@ -181,14 +328,14 @@ class CircularFlower(Flower):
         # the center of the plant is smaller, compared to other pellet sizes
         self.center_pellet_smaller_coefficient = uniform(0.75, 0.85)
 
-        self.pellet_drawing_function: Callable[[QPainter, float], None] = choice(
+        self.pellet_drawing_function: Callable[[float], QPainterPath] = choice(
             [self.circular_pellet, self.triangle_pellet, self.dip_pellet, self.round_pellet])
 
         # the m and n pellets don't look good with any other number of leafs (other than 5)
         if self.pellet_drawing_function in [self.dip_pellet, self.round_pellet]:
             self.number_of_pellets = 5
 
-    def triangle_pellet(self, painter: QPainter, pellet_size: float):
+    def triangle_pellet(self, pellet_size: float) -> QPainterPath:
         """A pellet that is pointy and triangular (1st in logo)"""
         pellet_size *= 1.5
 
@@ -196,13 +343,17 @@ class CircularFlower(Flower):
         pellet.setFillRule(Qt.WindingFill)
         pellet.quadTo(0.9 * pellet_size, 0.5 * pellet_size, 0, pellet_size)
         pellet.quadTo(-0.5 * pellet_size, 0.4 * pellet_size, 0, 0)
-        painter.drawPath(pellet)
 
-    def circular_pellet(self, painter: QPainter, pellet_size):
+        return pellet
+
+    def circular_pellet(self, pellet_size: float) -> QPainterPath:
         """A perfectly circular pellet (2nd in logo)."""
-        painter.drawEllipse(QRectF(0, 0, pellet_size, pellet_size))
+        pellet = QPainterPath()
+        pellet.addEllipse(QRectF(0, 0, pellet_size, pellet_size))
+
+        return pellet
 
-    def round_pellet(self, painter: QPainter, pellet_size):
+    def round_pellet(self, pellet_size: float) -> QPainterPath:
         """A pellet that is round but not a circle (3rd in the logo)."""
         pellet_size *= 1.3
 
@@ -212,9 +363,9 @@ class CircularFlower(Flower):
         for c in [1, -1]:
             pellet.quadTo(c * pellet_size * 0.8, pellet_size * 0.9, 0, pellet_size if c != -1 else 0)
 
-        painter.drawPath(pellet)
+        return pellet
 
-    def dip_pellet(self, painter: QPainter, pellet_size):
+    def dip_pellet(self, pellet_size: float) -> QPainterPath:
         """A pellet that has a dip in the middle (4th in the logo)."""
         pellet_size *= 1.2
 
@@ -224,34 +375,76 @@ class CircularFlower(Flower):
         for c in [1, -1]:
             pellet.quadTo(c * pellet_size, pellet_size * 1.4, 0, pellet_size if c != -1 else 0)
 
-        painter.drawPath(pellet)
+        return pellet
 
     def pellet_size(self, width):
         """Return the size of the pellet."""
         return width / 9 * self.deficit_coefficient
 
+    def get_pellet_template(self) -> QPainterPath:
+        """Return the path of the flower's pellet of size 1. The paths are only created once for each pellet type."""
+        name = self.pellet_drawing_function.__name__
+
+        if name not in CircularFlower.pellet_templates:
+            CircularFlower.pellet_templates[name] = self.pellet_drawing_function(1)
+
+        return CircularFlower.pellet_templates[name]
+
+    def get_pellet_paths(self) -> tuple:
+        """Return the paths of all of the rotated pellets of size 1. They are only created once for each pellet type
+        and number of pellets."""
+        key = (self.pellet_drawing_function.__name__, self.number_of_pellets)
+
+        if key not in CircularFlower.pellet_paths:
+            pellet_template = self.get_pellet_template()
+            paths = []
+
+            pellets = QPainterPath()
+            pellets.setFillRule(Qt.WindingFill)
+
+            angle = 360 / self.number_of_pellets
+
+            for i in range(self.number_of_pellets):
+                # antialiasing gets disproportionately slow for paths with a lot of elements, so split them in chunks
+                if pellets.elementCount() + pellet_template.elementCount() > self.MAX_PATH_ELEMENTS:
+                    paths.append(pellets)
+
+                    pellets = QPainterPath()
+                    pellets.setFillRule(Qt.WindingFill)
+
+                pellets.addPath(QTransform().rotate(i * angle).map(pellet_template))
+
+            paths.append(pellets)
+
+            CircularFlower.pellet_paths[key] = tuple(paths)
+
+        return CircularFlower.pellet_paths[key]
+
     def _draw(self, painter: QPainter, width: int, height: int):
         super()._draw(painter, width, height)
 
+        pellet_size = self.pellet_size(width) * self.smooth_age_coefficient
+
+        # the pellets (and the center) are smaller than a pixel
+        if pellet_size < 0.5:
+            return
+
         painter.save()
 
-        # move to the position of the flower
+        # move to the position of the flower and scale to the size of the pellets
         painter.translate(self.x, self.y)
+        painter.scale(pellet_size, pellet_size)
 
-        painter.setPen(QPen(Qt.NoPen))
-        painter.setBrush(QBrush(self.color))
-
-        pellet_size = self.pellet_size(width) * smoothen_curve(self.get_age_coefficient())
+        painter.setPen(Pen.none)
+        painter.setBrush(Brush.of(self.color))
 
-        # draw each of the pellets
-        for i in range(self.number_of_pellets):
-            self.pellet_drawing_function(painter, pellet_size)
-            painter.rotate(360 / self.number_of_pellets)
+        for pellets in self.get_pellet_paths():
+            painter.drawPath(pellets)
 
         # draw the center of the flower
-        painter.setBrush(QBrush(Color.white))
-        pellet_size *= self.center_pellet_smaller_coefficient
-        painter.drawEllipse(QRectF(-pellet_size / 2, -pellet_size / 2, pellet_size, pellet_size))
+        painter.setBrush(Brush.white)
+        center_size = self.center_pellet_smaller_coefficient
+        painter.drawEllipse(QRectF(-center_size / 2, -center_size / 2, center_size, center_size))
 
         painter.restore()
 
@@ -259,6 +452,8 @@ class CircularFlower(Flower):
 class Tree(Plant):
     """A simple tree class that all trees originate from."""
 
+    DERIVED_ATTRIBUTES = Plant.DERIVED_ATTRIBUTES + ("branch_positions", "branch_rotations")
+
     def __init__(self):
         super().__init__()
 
@@ -272,6 +467,15 @@ class Tree(Plant):
                               uniform(0.4, 0.6))) for i in
                          range(count)]
 
+        self.precompute()
+
+    def precompute(self):
+        super().precompute()
+
+        # positions of the branches and their rotations in degrees (which the painter uses)
+        self.branch_positions = tuple(h for h, _ in self.branches)
+        self.branch_rotations = tuple(degrees(rotation) for _, rotation in self.branches)
+
     def base_width(self, width):
         """The width of the base of the tree."""
         return width / 15 * self.deficit_coefficient
@@ -289,25 +493,33 @@ class Tree(Plant):
         return height / 2.7 * self.deficit_coefficient
 
     def _draw(self, painter: QPainter, width: int, height: int):
-        painter.setBrush(QBrush(Color.brown))
+        smooth_age = self.smooth_age_coefficient
+        smooth_slower_age = self.smooth_slower_age_coefficient
+
+        painter.setBrush(Brush.brown)
 
         # main branch
-        painter.drawPolygon(QPointF(-self.base_width(width) * smoothen_curve(self.get_age_coefficient()), 0),
-                            QPointF(self.base_width(width) * smoothen_curve(self.get_age_coefficient()), 0),
-                            QPointF(0, self.base_height(height) * smoothen_curve(self.get_age_coefficient())))
+        base_width = self.base_width(width) * smooth_age
+        base_height = self.base_height(height) * smooth_age
+        painter.drawPolygon(QPointF(-base_width, 0),
+                            QPointF(base_width, 0),
+                            QPointF(0, base_height))
+
+        branch_width = self.branch_width(width) * smooth_slower_age
+        branch_height = self.branch_height(height) * smooth_slower_age
 
         # other branches
-        for h, rotation in self.branches:
+        for h, branch_rotation in zip(self.branch_positions, self.branch_rotations):
             painter.save()
 
             # translate/rotate to the position from which the branches grow
-            painter.translate(0, self.base_height(height * h * smoothen_curve(self.get_age_coefficient())))
-            painter.rotate(degrees(rotation))
+            painter.translate(0, base_height * h)
+            painter.rotate(branch_rotation)
 
             painter.drawPolygon(
-                QPointF(-self.branch_width(width) * smoothen_curve(self.get_slower_age_coefficient()) * (1 - h), 0),
-                QPointF(self.branch_width(width) * smoothen_curve(self.get_slower_age_coefficient()) * (1 - h), 0),
-                QPointF(0, self.branch_height(height) * smoothen_curve(self.get_slower_age_coefficient()) * (1 - h)))
+                QPointF(-branch_width * (1 - h), 0),
+                QPointF(branch_width * (1 - h), 0),
+                QPointF(0, branch_height * (1 - h)))
 
             painter.restore()
 
@@ -329,36 +541,43 @@ class OrangeTree(Tree):
                                range(len(self.branches) + 1)]
 
     def _draw(self, painter: QPainter, width: int, height: int):
-        painter.setPen(QPen(Qt.NoPen))
-        painter.setBrush(QBrush(Color.orange))
+        age_coefficient = self.get_age_coefficient()
+        slower_age_coefficient = self.get_slower_age_coefficient()
+
+        painter.setPen(Pen.none)
+        painter.setBrush(Brush.orange)
 
-        for i, branch in enumerate(self.branches):
-            h, rotation = branch
+        # the top of the base and of the branches (without the (1 - h) coefficient), which are the same for all of them
+        base_height = self.base_height(height) * self.smooth_age_coefficient
+        branch_height = self.branch_height(height) * self.smooth_slower_age_coefficient
 
+        # the size of the circles (without their own coefficients)
+        size = (width + height) / 2
+        branch_circle_size = size * slower_age_coefficient * age_coefficient
+
+        for h, branch_rotation, (circle_size, circle_position) in zip(self.branch_positions, self.branch_rotations,
+                                                                      self.branch_circles):
             painter.save()
 
             # translate/rotate to the position from which the branches grow
-            painter.translate(0, self.base_height(height * h * smoothen_curve(self.get_age_coefficient())))
-            painter.rotate(degrees(rotation))
+            painter.translate(0, base_height * h)
+            painter.rotate(branch_rotation)
 
-            top_of_branch = self.branch_height(height) * smoothen_curve(self.get_slower_age_coefficient()) * (1 - h)
-            circle_on_branch_position = top_of_branch * self.branch_circles[i][1]
+            top_of_branch = branch_height * (1 - h)
+            circle_on_branch_position = top_of_branch * circle_position
 
-            r = ((width + height) / 2) * self.branch_circles[i][0] * self.get_slower_age_coefficient() * (
-                    1 - h) * self.get_age_coefficient()
+            r = branch_circle_size * circle_size * (1 - h)
 
-            painter.setBrush(QBrush(Color.orange))
             painter.drawEllipse(QPointF(0, circle_on_branch_position), r, r)
 
             painter.restore()
 
-        top_of_branch = self.base_height(height) * smoothen_curve(self.get_age_coefficient())
-        circle_on_branch_position = top_of_branch * self.branch_circles[-1][1]
+        circle_size, circle_position = self.branch_circles[-1]
+        circle_on_branch_position = base_height * circle_position
 
         # make the main ellipse slightly larger
         increase_size = 1.3
-        r = ((width + height) / 2) * self.branch_circles[-1][0] * self.get_age_coefficient() * (
-                1 - self.branches[-1][0]) * increase_size
+        r = size * circle_size * age_coefficient * (1 - self.branch_positions[-1]) * increase_size
 
         painter.drawEllipse(QPointF(0, circle_on_branch_position), r, r)
 
@@ -379,17 +598,23 @@ class GreenTree(Tree):
         """The height of the top part of the leafs."""
         return height / 1.5 * self.deficit_coefficient
 
-    def offset(self, height):
-        return min(height * 0.95, self.base_height(height * 0.3 * smoothen_curve(self.get_age_coefficient())))
+    def offset(self, height, smooth_age: float):
+        """The offset of the leafs from the bottom of the tree, given the smoothened age coefficient."""
+        return min(height * 0.95, self.base_height(height * 0.3 * smooth_age))
 
     def _draw(self, painter: QPainter, width: int, height: int):
-        painter.setPen(QPen(Qt.NoPen))
-        painter.setBrush(QBrush(Color.green))
+        smooth_age = self.smooth_age_coefficient
+
+        painter.setPen(Pen.none)
+        painter.setBrush(Brush.green)
+
+        offset = self.offset(height, smooth_age)
+        green_width = self.green_width(width) * smooth_age
 
         painter.drawPolygon(
-            QPointF(-self.green_width(width) * smoothen_curve(self.get_age_coefficient()), self.offset(height)),
-            QPointF(self.green_width(width) * smoothen_curve(self.get_age_coefficient()), self.offset(height)),
-            QPointF(0, self.green_height(height) * smoothen_curve(self.get_age_coefficient()) + self.offset(height)))
+            QPointF(-green_width, offset),
+            QPointF(green_width, offset),
+            QPointF(0, self.green_height(height) * smooth_age + offset))
 
         super()._draw(painter, width, height)
 
@@ -407,20 +632,21 @@ class DoubleGreenTree(GreenTree):
         return height / 2.4 * self.deficit_coefficient
 
     def _draw(self, painter: QPainter, width: int, height: int):
-        painter.setPen(QPen(Qt.NoPen))
-        painter.setBrush(QBrush(Color.green))
+        smooth_age = self.smooth_age_coefficient
+
+        painter.setPen(Pen.none)
+        painter.setBrush(Brush.green)
+
+        second_green_height = self.second_green_height(height)
 
-        offset = self.base_height(height * 0.3 * smoothen_curve(self.get_age_coefficient()))
-        second_offset = (self.green_height(height) - self.second_green_height(height)) * smoothen_curve(
-            self.get_age_coefficient())
+        offset = self.base_height(height * 0.3 * smooth_age)
+        second_offset = (self.green_height(height) - second_green_height) * smooth_age
+        bottom = offset + second_offset
+        second_green_width = self.second_green_width(width) * smooth_age ** 2
 
         painter.drawPolygon(
-            QPointF(-self.second_green_width(width) * smoothen_curve(self.get_age_coefficient()) ** 2,
-                    offset + second_offset),
-            QPointF(self.second_green_width(width) * smoothen_curve(self.get_age_coefficient()) ** 2,
-                    offset + second_offset),
-            QPointF(0, min(
-                self.second_green_height(height) * smoothen_curve(self.get_age_coefficient()) + offset + second_offset,
-                height * 0.95)))
+            QPointF(-second_green_width, bottom),
+            QPointF(second_green_width, bottom),
+            QPointF(0, min(second_green_height * smooth_age + bottom, height * 0.95)))
 
         super()._draw(painter, width, height)
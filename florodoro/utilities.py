@@ -1,6 +1,38 @@
+from datetime import datetime
+from functools import lru_cache
 from math import sin, pi
 
+import qtawesome
+
 
 def smoothen_curve(x: float):
     """f(x) with a smoother beginning and end."""
     return (sin((x - 1 / 2) * pi) + 1) / 2
+
+
+@lru_cache(maxsize=None)
+def get_icon(name: str, color: str):
+    """Return the QtAwesome icon of the given name and color (a color name, e.g. '#B37700').
+    Cached, so each icon is only created once."""
+    return qtawesome.icon(name, color=color)
+
+
+@lru_cache(maxsize=1024)
+def format_date(date: datetime) -> str:
+    """Return the date in the d/m/Y format. Cached, since the dates of the history records don't change."""
+    return date.strftime("%-d/%-m/%Y")
+
+
+def load_yaml(path: str):
+    """Load a YAML file. Only used for the old (YAML) config/history files, since JSON is a lot faster to parse.
+    PyYAML is imported here, so it isn't loaded on every start just for converting them."""
+    import yaml
+
+    # use the (much faster) libyaml bindings for loading, if PyYAML was built with them
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
+    with open(path) as f:
+        return yaml.load(f, Loader=SafeLoader)
@@ -1,14 +1,29 @@
 import pickle
-from typing import Optional
+from copy import deepcopy
+from typing import Optional, List
 
-import qtawesome
-from PyQt5.QtChart import QStackedBarSeries, QBarSet, QChart, QBarCategoryAxis, QChartView
-from PyQt5.QtCore import QMargins, Qt
-from PyQt5.QtGui import QPainter, QBrush
+from PyQt5.QtCore import Qt, QRectF, QTimer, QPointF, QRunnable, QThreadPool
+from PyQt5.QtGui import QPainter, QPixmap, QPalette
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QSlider, QGridLayout, QFrame, \
     QFileDialog
 
 from florodoro.plants import Drawable, Plant
+from florodoro.utilities import get_icon, format_date
+
+
+class SaveDrawableJob(QRunnable):
+    """A job that saves a drawable to a file (in a thread of a thread pool), so it doesn't block the UI."""
+
+    def __init__(self, drawable: Drawable, path: str, width: int, height: int):
+        super().__init__()
+
+        self.drawable = drawable
+        self.path = path
+        self.width = width
+        self.height = height
+
+    def run(self):
+        self.drawable.save(self.path, self.width, self.height)
 
 
 class Canvas(QWidget):
@@ -18,6 +33,15 @@ class Canvas(QWidget):
         super(Canvas, self).__init__(*args, **kwargs)
         self.object: Optional[Drawable] = None
 
+        # the drawable rendered to a pixmap, so it doesn't have to be drawn again if it (and the canvas) didn't change
+        self.cache: Optional[QPixmap] = None
+        self.cache_key = None
+
+        # incremented whenever the drawable changes (see set_drawable and update_drawable)
+        # the cache is keyed on this instead of the state of the drawable, so it is only drawn again when it visibly
+        # changed, not on every repaint (e.g. of the widgets on top of the canvas)
+        self.version = 0
+
     def save(self, path: str):
         """Save the drawable object to the specified file."""
         self.object.save(path, self.width(), self.height())
@@ -25,16 +49,132 @@ class Canvas(QWidget):
     def set_drawable(self, obj: Drawable):
         """Set the drawable that the canvas draws."""
         self.object = obj
+        self.version += 1
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def update_drawable(self):
+        """Schedule a repaint of the part of the canvas that the drawable is drawn in. Should be called whenever the
+        drawable changes."""
+        self.version += 1
+
+        if self.object is None:
+            self.update()
+        else:
+            self.update(self.object.bounding_rect(self.width(), self.height()))
+
+    def render_cache(self):
+        """Render the drawable to the cache pixmap."""
+        ratio = self.devicePixelRatioF()
+
+        # only create a new pixmap if the size changed, otherwise just clear the old one
+        if self.cache is None or self.cache.size() != self.size() * ratio:
+            self.cache = QPixmap(self.size() * ratio)
+            self.cache.setDevicePixelRatio(ratio)
+
+        self.cache.fill(Qt.transparent)
+
+        painter = QPainter(self.cache)
         painter.setRenderHint(QPainter.Antialiasing, True)
         painter.setClipRect(0, 0, self.width(), self.height())
 
+        self.object.draw(painter, self.width(), self.height())
+
+        painter.end()
+
+    def paintEvent(self, event):
         if self.object is None:
             return
 
-        self.object.draw(painter, self.width(), self.height())
+        # only draw the drawable again if it could look differently
+        cache_key = (self.version, self.width(), self.height())
+        if cache_key != self.cache_key:
+            self.render_cache()
+            self.cache_key = cache_key
+
+        # only copy the part that needs repainting (see update_drawable)
+        rect = event.rect()
+        ratio = self.cache.devicePixelRatio()
+        source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+
+        painter = QPainter(self)
+        painter.drawPixmap(QRectF(rect), self.cache, source)
+        painter.end()
+
+
+class BarChart(QWidget):
+    """A simple bar chart (title, y axis with integer labels and labeled bars), drawn directly with a painter."""
+
+    def __init__(self, title: str, labels: List[str], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.title = title
+        self.labels = labels
+        self.values = [0] * len(labels)
+
+        self.SPACING = 5
+        self.TICKS = 5  # the number of labels on the y axis
+        self.BAR_WIDTH = 0.5  # the width of a bar, relative to the space for it
+
+    def set_values(self, values: List[float]):
+        """Set the values of the bars and repaint the chart."""
+        # copied into the existing list (there is one value for each label)
+        self.values[:] = values
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+
+        palette = self.palette()
+        painter.setPen(palette.text().color())
+
+        metrics = self.fontMetrics()
+        line_height = metrics.height()
+
+        # the y axis goes from 0 to the largest value (or 1, so there is something to divide by)
+        maximum = max(max(self.values, default=0), 1)
+        ticks = [maximum * i / (self.TICKS - 1) for i in range(self.TICKS)]
+        tick_labels = [f"{int(tick)}" for tick in ticks]
+
+        # the area of the bars (without the title and the axis labels)
+        left = max(metrics.horizontalAdvance(label) for label in tick_labels) + self.SPACING
+        top = line_height + self.SPACING * 2
+        right = self.width() - 1
+        bottom = self.height() - line_height - self.SPACING
+        height = bottom - top
+
+        # title
+        font = painter.font()
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(QRectF(0, 0, self.width(), line_height), Qt.AlignCenter, self.title)
+        font.setBold(False)
+        painter.setFont(font)
+
+        # axes
+        painter.drawLine(QPointF(left, top), QPointF(left, bottom))
+        painter.drawLine(QPointF(left, bottom), QPointF(right, bottom))
+
+        # labels of the y axis
+        for tick, tick_label in zip(ticks, tick_labels):
+            y = bottom - tick / maximum * height
+            painter.drawText(QRectF(0, y - line_height / 2, left - self.SPACING, line_height),
+                             Qt.AlignRight | Qt.AlignVCenter, tick_label)
+
+        # bars and their labels
+        slot_width = (right - left) / max(len(self.values), 1)
+        bar_width = slot_width * self.BAR_WIDTH
+
+        bars = []
+        for i, (value, label) in enumerate(zip(self.values, self.labels)):
+            x = left + slot_width * i
+            bar_height = value / maximum * height
+
+            bars.append(QRectF(x + (slot_width - bar_width) / 2, bottom - bar_height, bar_width, bar_height))
+            painter.drawText(QRectF(x, bottom + self.SPACING, slot_width, line_height), Qt.AlignCenter, label)
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(palette.highlight())
+        painter.drawRects(bars)
 
         painter.end()
 
@@ -45,6 +185,9 @@ class Statistics(QWidget):
     def __init__(self, history, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        # don't repaint anything while the widget is being built (it is repainted once at the end)
+        self.setUpdatesEnabled(False)
+
         self.history = history
 
         chart = self.generate_chart()
@@ -59,8 +202,13 @@ class Statistics(QWidget):
         image_layout = QVBoxLayout()
 
         self.plant_study = None  # the study record the plant is a part of
+        self.plant_index = None  # the index of the study record in the (sorted) studies
+        self.plant_age_coefficient = 0  # the age coefficient of the plant at the end of its study
         self.plant: Optional[Plant] = None  # the plant being displayed
 
+        # the already unpickled plants, by the id of their study record (the records stay in the history)
+        self.plants = {}
+
         self.plant_date_label = QLabel(self)
         self.plant_date_label.setAlignment(Qt.AlignLeft)
 
@@ -81,18 +229,26 @@ class Statistics(QWidget):
 
         image_control = QHBoxLayout()
 
+        # the text color is shared by the icons and the separator
         text_color = self.palette().text().color()
+        icon_color = text_color.name()
+
+        # the slider changes its value a lot more often than the plant can (or needs to) be redrawn, so the changes are
+        # only applied at most once per SLIDER_UPDATE_INTERVAL milliseconds (~60 FPS)
+        self.SLIDER_UPDATE_INTERVAL = 16
+        self.slider_timer = QTimer(self, singleShot=True, interval=self.SLIDER_UPDATE_INTERVAL,
+                                   timeout=self.update_plant_age)
 
         # a hack to get float (we're gonna be dividing by the maximum)
         self.age_slider = QSlider(Qt.Horizontal, minimum=0, maximum=1000, value=1000,
                                   valueChanged=self.slider_value_changed)
 
         self.left_button = QPushButton(self, clicked=self.left,
-                                       icon=qtawesome.icon('fa5s.angle-left', color=text_color))
+                                       icon=get_icon('fa5s.angle-left', icon_color))
         self.right_button = QPushButton(self, clicked=self.right,
-                                        icon=qtawesome.icon('fa5s.angle-right', color=text_color))
+                                        icon=get_icon('fa5s.angle-right', icon_color))
         self.save_button = QPushButton(self, clicked=self.save,
-                                       icon=qtawesome.icon('fa5s.download', color=text_color))
+                                       icon=get_icon('fa5s.download', icon_color))
 
         image_control.addWidget(self.left_button)
         image_control.addWidget(self.right_button)
@@ -105,8 +261,11 @@ class Statistics(QWidget):
         image_layout.addLayout(image_control)
         image_layout.setContentsMargins(self.SPACING, self.SPACING, self.SPACING, self.SPACING)
 
-        separator = QFrame()
-        separator.setStyleSheet(f"background-color: {self.palette().text().color().name()}")
+        # a plain vertical line in the color of the text (without going through style sheets)
+        separator = QFrame(frameShape=QFrame.VLine, frameShadow=QFrame.Plain)
+        palette = separator.palette()
+        palette.setColor(QPalette.WindowText, text_color)
+        separator.setPalette(palette)
         separator.setFixedWidth(1)
 
         main_layout = QGridLayout()
@@ -123,76 +282,32 @@ class Statistics(QWidget):
 
         self.refresh()
 
+        self.setUpdatesEnabled(True)
+
     def generate_chart(self):
         """Generate the bar graph for the widget."""
-        self.tags = [QBarSet(tag) for tag in ["Study"]]
-
-        series = QStackedBarSeries()
-
-        for set in self.tags:
-            series.append(set)
-
-        self.chart = QChart()
-        self.chart.addSeries(series)
-        self.chart.setTitle("Total time studied (minutes per day)")
-
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        axis = QBarCategoryAxis()
-        axis.append(days)
+        self.chart = BarChart("Total time studied (minutes per day)",
+                              ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], self)
 
-        self.chart.createDefaultAxes()
-        self.chart.setAxisX(axis, series)
-        self.chart.legend().setAlignment(Qt.AlignBottom)
-        self.chart.legend().setVisible(False)
-        self.chart.setTheme(QChart.ChartThemeQt)
-        self.chart.setBackgroundVisible(False)
-        self.chart.setBackgroundRoundness(0)
-        self.chart.setMargins(QMargins(0, 0, 0, 0))
-        self.chart.setTitleBrush(QBrush(self.palette().text().color()))
-
-        yAxis = self.chart.axes(Qt.Vertical)[0]
-        yAxis.setGridLineVisible(False)
-        yAxis.setLabelFormat("%d")
-        yAxis.setLinePenColor(self.palette().text().color())
-        yAxis.setLabelsColor(self.palette().text().color())
-
-        xAxis = self.chart.axes(Qt.Horizontal)[0]
-        xAxis.setGridLineVisible(False)
-        xAxis.setLinePenColor(self.palette().text().color())
-        xAxis.setLabelsColor(self.palette().text().color())
-
-        chartView = QChartView(self.chart)
-        chartView.setRenderHint(QPainter.Antialiasing)
-
-        return chartView
+        return self.chart
 
     def slider_value_changed(self):
-        """Called when the slider value has changed. Sets the age of the plant and updates it."""
+        """Called when the slider value has changed. Schedules updating the age of the plant."""
+        if not self.slider_timer.isActive():
+            self.slider_timer.start()
+
+    def update_plant_age(self):
+        """Set the age of the plant from the slider value and update it."""
         if self.plant is not None:
             # makes it a linear function from 0 to whatever the duration was, so the plant appears to grow normally
             self.plant.set_age(
                 self.plant.inverse_age_coefficient_function(self.age_slider.value() / self.age_slider.maximum() *
-                                                            self.plant.age_coefficient_function(
-                                                                self.plant_study["duration"])))
-            self.canvas.update()
+                                                            self.plant_age_coefficient))
+            self.canvas.update_drawable()
 
     def refresh(self):
         """Refresh the labels."""
-        # clear tag values
-        for tag in self.tags:
-            tag.remove(0, tag.count())
-
-        study_minutes = [0] * 7
-        for study in self.history.get_studies():
-            # TODO: don't just crash
-            study_minutes[study["date"].weekday()] += study["duration"]
-
-        for minutes in study_minutes:
-            self.tags[0] << minutes
-
-        # manually set the range of the y axis, because it doesn't for some reason
-        yAxis = self.chart.axes(Qt.Vertical)[0]
-        yAxis.setRange(0, max(study_minutes))
+        self.chart.set_values(self.history.study_time_by_weekday())
 
     def left(self):
         """Move to the left (older) plant."""
@@ -215,24 +330,37 @@ class Statistics(QWidget):
 
         # if no plant is being displayed or 0 is provided, pick the last one
         if self.plant is None or delta == 0:
-            index = -1
+            index = len(studies) - 1
 
         # if one is, find it and move by delta
         else:
-            current_index = self.history.get_studies().index(self.plant_study)
+            current_index = self.plant_index
+
+            # only search for it if the studies changed in a way that moved it
+            if current_index >= len(studies) or studies[current_index] is not self.plant_study:
+                current_index = studies.index(self.plant_study)
 
             index = max(min(current_index + delta, len(studies) - 1), 0)
 
-        # TODO: check for correct formatting, don't just crash if it's wrong
-        self.plant = pickle.loads(studies[index]["plant"])
+        self.plant_index = index
         self.plant_study = studies[index]
 
         # TODO: check for correct formatting, don't just crash if it's wrong
-        self.plant_date_label.setText(self.plant_study["date"].strftime("%-d/%-m/%Y"))
+        if id(self.plant_study) not in self.plants:
+            self.plants[id(self.plant_study)] = pickle.loads(self.plant_study["plant"])
+
+        self.plant = self.plants[id(self.plant_study)]
+
+        # studies without a plant (when no plant was enabled) store a pickled None
+        if self.plant is not None:
+            self.plant_age_coefficient = self.plant.age_coefficient_function(self.plant_study["duration"])
+
+        # TODO: check for correct formatting, don't just crash if it's wrong
+        self.plant_date_label.setText(format_date(self.plant_study["date"]))
         self.plant_duration_label.setText(f"{int(self.plant_study['duration'])} minutes")
 
         self.canvas.set_drawable(self.plant)
-        self.slider_value_changed()  # it didn't, but the code should act as if it did (update plant)
+        self.update_plant_age()
 
     def save(self):
         """Save the current state of the plant to a file."""
@@ -245,7 +373,8 @@ class Statistics(QWidget):
             if not name.endswith(".svg"):
                 name += ".svg"
 
-            self.plant.save(name, 1000, 1000)
+            # save a copy, since the displayed plant keeps changing its age
+            QThreadPool.globalInstance().start(SaveDrawableJob(deepcopy(self.plant), name, 1000, 1000))
 
 
 class SpacedQWidget(QWidget):